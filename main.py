@@ -1,18 +1,38 @@
 import argparse
+import concurrent.futures
 import configparser
+import contextlib
+import datetime
+import decimal
+import functools
+import io
+import json
+import multiprocessing
+import os
+import queue
+import re
 import sys
+import threading
 import time
 import mysql.connector
 import psycopg2
-from psycopg2 import extras
+from psycopg2 import extensions, extras, sql
 
 def parse_arguments():
     """Parses command-line arguments."""
     parser = argparse.ArgumentParser(description="Migrate data from MySQL to PostgreSQL.")
     parser.add_argument('--config', type=str, default='config.ini', help='Path to the configuration file.')
-    parser.add_argument('--chunk-size', type=int, default=1000, help='Number of records to migrate at a time.')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='Number of records to migrate at a time.')
     parser.add_argument('--recreate', action='store_true', help='Recreate all target tables even if they exist.')
     parser.add_argument('--truncate', action='store_true', help='Truncate target tables if they exist before migration.')
+    parser.add_argument('--unlogged-fast-load', action='store_true', help='Load new tables as UNLOGGED and switch them to LOGGED once loaded, before building their indexes.')
+    parser.add_argument('--commit-every', type=int, default=10, help='Commit and checkpoint progress every N chunks (0 commits once per table).')
+    parser.add_argument('--state-file', type=str, default='.mysql2pg.state.json', help='Path to the checkpoint file used to resume interrupted migrations.')
+    parser.add_argument('--exact-count', action='store_true', help='Count rows with SELECT COUNT(*) instead of using the table statistics estimate for progress.')
+    parser.add_argument('--writer', choices=('copy', 'values', 'mogrify'), default='copy', help='How rows are written to PostgreSQL: COPY, execute_values or a mogrify-assembled INSERT.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of tables to migrate concurrently, each in its own process.')
+    parser.add_argument('--range-threads', type=int, default=1, help='Number of threads migrating disjoint key ranges of a large table concurrently.')
+    parser.add_argument('--range-threshold', type=int, default=1000000, help='Minimum number of rows for a table to be split into key ranges.')
     return parser.parse_args()
 
 def load_config(config_path):
@@ -40,63 +60,616 @@ def connect_mysql(config):
 def connect_postgres(config):
     """Establishes a connection to the PostgreSQL database."""
     try:
-        return psycopg2.connect(
+        pg_conn = psycopg2.connect(
             host=config['host'],
             user=config['user'],
             password=config['password'],
             dbname=config['database'],
             port=config.get('port', 5432)
         )
+        configure_postgres_session(pg_conn)
+        return pg_conn
     except psycopg2.Error as err:
         print(f"Error connecting to PostgreSQL: {err}")
         sys.exit(1)
 
+# Session settings for bulk loading. Losing the last few commits on a server crash
+# is acceptable here since an interrupted migration has to be re-run anyway.
+POSTGRES_SESSION_SETTINGS = (
+    "SET synchronous_commit = off",
+    "SET work_mem = '256MB'",
+    "SET maintenance_work_mem = '1GB'",
+    "SET temp_buffers = '256MB'",
+    "SET client_min_messages = warning",
+)
+
+def configure_postgres_session(pg_conn):
+    """Tunes a PostgreSQL session for bulk loading, with explicit per-table commits."""
+    pg_conn.set_session(autocommit=False)
+    with pg_conn.cursor() as pg_cursor:
+        for setting_sql in POSTGRES_SESSION_SETTINGS:
+            pg_cursor.execute(setting_sql)
+    # Commit so that a later rollback doesn't revert the settings.
+    pg_conn.commit()
+
 def get_mysql_tables(my_conn):
     """Gets a list of all tables from the MySQL database."""
     with my_conn.cursor() as my_cursor:
         my_cursor.execute("SHOW TABLES")
         return [row[0] for row in my_cursor.fetchall()]
 
+def get_mysql_schemas(my_conn):
+    """
+    Fetches the columns and indexes of every table in the MySQL database at once.
+    Rows keep the shape of DESCRIBE and SHOW INDEX output, so a table's cached
+    schema can be used in place of those per-table queries.
+    """
+    schemas = {}
+    with my_conn.cursor() as my_cursor:
+        my_cursor.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA "
+            "FROM information_schema.columns WHERE table_schema = DATABASE() "
+            "ORDER BY TABLE_NAME, ORDINAL_POSITION"
+        )
+        for row in my_cursor.fetchall():
+            schemas.setdefault(row[0], {'columns': [], 'indexes': []})['columns'].append(tuple(row[1:]))
+
+        my_cursor.execute(
+            "SELECT TABLE_NAME, NON_UNIQUE, INDEX_NAME, SEQ_IN_INDEX, COLUMN_NAME, COLLATION, "
+            "CARDINALITY, SUB_PART, PACKED, NULLABLE, INDEX_TYPE "
+            "FROM information_schema.statistics WHERE table_schema = DATABASE() "
+            "ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"
+        )
+        for row in my_cursor.fetchall():
+            schemas.setdefault(row[0], {'columns': [], 'indexes': []})['indexes'].append(tuple(row))
+    return schemas
+
 def get_postgres_tables(pg_conn):
-    """Gets a list of all tables from the public schema in PostgreSQL."""
+    """Gets the set of all tables from the public schema in PostgreSQL, for O(1) lookups."""
     with pg_conn.cursor() as pg_cursor:
         pg_cursor.execute("SELECT table_name FROM information_schema.tables WHERE table_schema='public'")
-        return [row[0] for row in pg_cursor.fetchall()]
+        return frozenset(row[0] for row in pg_cursor.fetchall())
 
+def map_mysql_integer_type(mysql_type):
+    """Maps MySQL integer types, widening unsigned ones so that their full range fits."""
+    return 'BIGINT' if 'unsigned' in mysql_type.lower() else 'INTEGER'
+
+# Maps a MySQL base type (the leading word of the column type) to its PostgreSQL
+# type, or to a function of the full column type when its length or precision
+# has to be carried over, e.g. varchar(255) or decimal(10,2).
+MYSQL_TO_POSTGRES_TYPES = {
+    'bigint': 'BIGINT',
+    'tinyint': map_mysql_integer_type,
+    'smallint': map_mysql_integer_type,
+    'mediumint': map_mysql_integer_type,
+    'int': map_mysql_integer_type,
+    'integer': map_mysql_integer_type,
+    'varchar': lambda mysql_type: mysql_type.replace('varchar', 'VARCHAR'),
+    'char': lambda mysql_type: mysql_type.replace('char', 'CHAR'),
+    'tinytext': 'TEXT',
+    'text': 'TEXT',
+    'mediumtext': 'TEXT',
+    'longtext': 'TEXT',
+    'datetime': 'TIMESTAMP',
+    'timestamp': 'TIMESTAMP',
+    'date': 'DATE',
+    'decimal': lambda mysql_type: mysql_type.upper(), # e.g., DECIMAL(10, 2)
+    'float': 'REAL',
+    'double': 'DOUBLE PRECISION',
+    'tinyblob': 'BYTEA',
+    'blob': 'BYTEA',
+    'mediumblob': 'BYTEA',
+    'longblob': 'BYTEA',
+    'binary': 'BYTEA',
+    'varbinary': 'BYTEA',
+}
+MYSQL_BASE_TYPE_PATTERN = re.compile(r'\s*(\w+)')
+# Prefixes of the mapped PostgreSQL types that hold text.
+POSTGRES_TEXT_TYPES = ('CHAR', 'VARCHAR', 'TEXT')
+
+@functools.lru_cache(maxsize=None)
 def map_mysql_to_postgres_type(mysql_type):
     """
     Maps MySQL data types to PostgreSQL data types.
     This is a simplified mapping and might need adjustments for specific needs.
     """
-    mysql_type_lower = mysql_type.lower()
-    if 'bigint' in mysql_type_lower:
-        return 'BIGINT'
-    if 'unsigned' in mysql_type_lower and 'int' in mysql_type_lower:
-        return 'BIGINT'
-    if 'int' in mysql_type_lower:
-        return 'INTEGER'
-    if 'varchar' in mysql_type_lower:
-        return mysql_type.replace('varchar', 'VARCHAR')
-    if 'char' in mysql_type_lower:
-        return mysql_type.replace('char', 'CHAR')
-    if 'text' in mysql_type_lower or 'longtext' in mysql_type_lower:
+    match = MYSQL_BASE_TYPE_PATTERN.match(mysql_type)
+    pg_type = MYSQL_TO_POSTGRES_TYPES.get(match.group(1).lower()) if match else None
+    if pg_type is None:
+        print(f"Warning: Unsupported MySQL type '{mysql_type}'. Defaulting to TEXT.")
         return 'TEXT'
-    if 'datetime' in mysql_type_lower or 'timestamp' in mysql_type_lower:
-        return 'TIMESTAMP'
-    if 'date' in mysql_type_lower:
-        return 'DATE'
-    if 'decimal' in mysql_type_lower:
-        return mysql_type.upper() # e.g., DECIMAL(10, 2)
-    if 'float' in mysql_type_lower:
-        return 'REAL'
-    if 'double' in mysql_type_lower:
-        return 'DOUBLE PRECISION'
-    if 'blob' in mysql_type_lower or 'binary' in mysql_type_lower:
-        return 'BYTEA'
-    
-    print(f"Warning: Unsupported MySQL type '{mysql_type}'. Defaulting to TEXT.")
-    return 'TEXT'
+    return pg_type(mysql_type) if callable(pg_type) else pg_type
+
+
+# Characters that must be backslash-escaped in PostgreSQL's COPY text format.
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+COPY_PLAIN_TYPES = (int, float, decimal.Decimal, datetime.date, datetime.time)
+
+def format_mysql_time(value):
+    """Formats a MySQL TIME value, returned as a timedelta, as [-]HH:MM:SS[.ffffff]."""
+    sign = '-' if value < datetime.timedelta(0) else ''
+    value = abs(value)
+    minutes, seconds = divmod(value.days * 86400 + value.seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    fraction = f".{value.microseconds:06d}" if value.microseconds else ''
+    return f"{sign}{hours:02d}:{minutes:02d}:{seconds:02d}{fraction}"
+
+def format_mysql_set(value):
+    """
+    Formats a MySQL SET value, returned as a Python set, as MySQL does: comma-separated.
+    The set has lost the members' definition order, so they are sorted instead.
+    """
+    return ','.join(sorted(value))
+
+# Lets execute_values and mogrify adapt TIME and SET values like the COPY writer does.
+extensions.register_adapter(datetime.timedelta, lambda value: extensions.adapt(format_mysql_time(value)))
+extensions.register_adapter(set, lambda value: extensions.adapt(format_mysql_set(value)))
+
+def format_copy_value(value):
+    """Formats a single Python value as a field of the COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    if isinstance(value, (bytes, bytearray)):
+        # BYTEA hex input ('\x...'), with the backslash escaped for COPY.
+        return '\\\\x' + value.hex()
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, COPY_PLAIN_TYPES):
+        return str(value)
+    if isinstance(value, datetime.timedelta):
+        return format_mysql_time(value)
+    if isinstance(value, set):
+        return format_mysql_set(value).translate(COPY_ESCAPES)
+    raise TypeError(f"unsupported value of type '{type(value).__name__}' for COPY")
+
+def build_copy_buffer(rows, encoding, strip_nul=True):
+    """
+    Serializes rows into an in-memory buffer in PostgreSQL's COPY text format.
+    The chunk is encoded once, and NUL characters, which PostgreSQL rejects in
+    text values, are then stripped from the raw bytes with a single C-level pass
+    unless strip_nul is False (tables without text columns).
+    """
+    data = ''.join(['\t'.join([format_copy_value(value) for value in row]) + '\n' for row in rows])
+    encoded = data.encode(encoding)
+    return io.BytesIO(encoded.translate(None, b'\x00') if strip_nul else encoded)
+
+def build_load_statements(pg_conn, table_name, column_names, text_columns):
+    """
+    Builds the COPY and INSERT statements used to load a table, once per table,
+    together with the indices of its text columns, the only ones sanitized.
+    Identifiers are quoted by psycopg2.sql, and the INSERT statement and its row
+    template are pre-encoded with the connection's encoding, so execute_values and
+    mogrify don't re-compose or re-encode them for every chunk and row.
+    """
+    encoding = extensions.encodings[pg_conn.encoding]
+    table_sql = sql.Identifier(table_name)
+    columns_sql = sql.SQL(", ").join(map(sql.Identifier, column_names))
+    insert_prefix = sql.SQL("INSERT INTO {} ({}) VALUES ").format(table_sql, columns_sql).as_string(pg_conn)
+    return {
+        'encoding': encoding,
+        'text_columns': tuple(text_columns),
+        'copy': sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT text)").format(table_sql, columns_sql).as_string(pg_conn),
+        'insert': (insert_prefix + "%s").encode(encoding),
+        'insert_prefix': insert_prefix.encode(encoding),
+        # Passing the row template avoids execute_values rebuilding it for every page.
+        'template': ("(" + ",".join(["%s"] * len(column_names)) + ")").encode(encoding)
+    }
+
+def strip_row_nul(row, text_columns):
+    """Returns a copy of row with NUL characters removed from its text columns."""
+    row = list(row)
+    for i in text_columns:
+        value = row[i]
+        if isinstance(value, str) and '\x00' in value:
+            row[i] = value.replace('\x00', '')
+    return tuple(row)
+
+def sanitize_rows(rows, text_columns):
+    """
+    Strips NUL characters, which PostgreSQL rejects in text values, from a chunk of rows.
+    Only the text columns are inspected. The chunk is returned untouched when the
+    table has no text columns or the chunk holds no NUL, and as a lazy generator
+    of cleaned rows otherwise.
+    """
+    if not text_columns:
+        return rows
+    _str = str
+    _isinstance = isinstance
+    # The 'in' check is a memchr scan, much cheaper than rebuilding every row.
+    if not any(_isinstance(row[i], _str) and '\x00' in row[i] for row in rows for i in text_columns):
+        return rows
+    return (strip_row_nul(row, text_columns) for row in rows)
+
+def insert_rows_mogrify(pg_cursor, statements, rows):
+    """
+    Inserts rows with one multi-row INSERT assembled client-side with mogrify.
+    Matches execute_values without depending on psycopg2.extras.
+    """
+    template = statements['template']
+    values_sql = b",".join([pg_cursor.mogrify(template, row) for row in rows])
+    pg_cursor.execute(statements['insert_prefix'] + values_sql)
+
+def write_rows(pg_cursor, table_name, statements, rows, writer):
+    """
+    Writes a chunk of rows into PostgreSQL with the given writer:
+    'copy' (COPY FROM STDIN), 'values' (execute_values) or 'mogrify'.
+    COPY falls back to execute_values when the chunk contains values the COPY
+    serializer cannot handle. Returns the writer to use for the following chunks.
+    """
+    if writer == 'copy':
+        try:
+            buf = build_copy_buffer(rows, statements['encoding'], bool(statements['text_columns']))
+        except TypeError as err:
+            print(f"\nWarning: {err}. Falling back to INSERT for table '{table_name}'.")
+            writer = 'values'
+        else:
+            pg_cursor.copy_expert(statements['copy'], buf)
+            return writer
+
+    if writer == 'mogrify':
+        insert_rows_mogrify(pg_cursor, statements, sanitize_rows(rows, statements['text_columns']))
+        return writer
 
+    # A single page per chunk sends the whole chunk in one round-trip.
+    extras.execute_values(
+        pg_cursor,
+        statements['insert'],
+        sanitize_rows(rows, statements['text_columns']),
+        template=statements['template'],
+        page_size=len(rows)
+    )
+    return writer
+
+
+@contextlib.contextmanager
+def open_stream_cursor(my_conn):
+    """
+    Opens an unbuffered MySQL cursor for streaming a result set.
+    Closing it before the result set is fully read raises "Unread result found",
+    which would hide the error that interrupted the stream. On failure the cursor
+    is closed quietly and the connection dropped, so the original error propagates.
+    """
+    data_cursor = my_conn.cursor(buffered=False)
+    try:
+        yield data_cursor
+    except BaseException:
+        with contextlib.suppress(mysql.connector.Error):
+            data_cursor.close()
+        with contextlib.suppress(mysql.connector.Error):
+            my_conn.close()
+        # The connection still flags the abandoned result set, which would make
+        # closing any other cursor on it, e.g. migrate_table's, raise in turn.
+        my_conn.unread_result = False
+        raise
+    data_cursor.close()
+
+def read_chunks(data_cursor, chunk_size, chunk_queue, stop_event, errors):
+    """Reader thread body: fetches chunks from MySQL and pushes them into a bounded queue."""
+    try:
+        while not stop_event.is_set():
+            rows_chunk = data_cursor.fetchmany(chunk_size)
+            if not rows_chunk:
+                break
+            chunk_queue.put(rows_chunk)
+    except Exception as err:
+        errors.append(err)
+    finally:
+        chunk_queue.put(None)
+
+def stream_chunks(data_cursor, chunk_size, max_queued_chunks=4):
+    """
+    Yields chunks of rows read from an executed MySQL cursor.
+    Reading happens on a background thread so that fetching the next chunk from
+    MySQL overlaps with writing the current one to PostgreSQL. Both drivers release
+    the GIL during socket I/O, and the bounded queue caps memory to
+    max_queued_chunks * chunk_size rows.
+    """
+    chunk_queue = queue.Queue(maxsize=max_queued_chunks)
+    stop_event = threading.Event()
+    errors = []
+    reader = threading.Thread(
+        target=read_chunks,
+        args=(data_cursor, chunk_size, chunk_queue, stop_event, errors),
+        daemon=True
+    )
+    reader.start()
+    try:
+        while True:
+            rows_chunk = chunk_queue.get()
+            if rows_chunk is None:
+                break
+            yield rows_chunk
+    finally:
+        # Stop the reader and drain the queue so it is never left blocked on put().
+        stop_event.set()
+        while reader.is_alive():
+            try:
+                chunk_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        reader.join()
+    if errors:
+        raise errors[0]
+
+
+# Minimum number of seconds between two redraws of the progress line on a terminal.
+PROGRESS_INTERVAL = 0.25
+# Minimum number of seconds between two logged progress lines when not on a terminal.
+LOG_INTERVAL = 10
+# Set in worker processes so that progress lines from concurrent tables don't interleave.
+OUTPUT_LOCK = None
+# Set in worker processes so that concurrent checkpoints don't overwrite each other.
+STATE_LOCK = None
+
+def write_progress(table_name, message, interactive):
+    """
+    Reports table progress: rewrites the progress line on a terminal, and logs it as
+    its own line otherwise. Output is prefixed with the table name in worker processes.
+    """
+    if interactive:
+        text = f"\r{message}   " if OUTPUT_LOCK is None else f"\r[{table_name}] {message}   "
+    else:
+        text = f"[{table_name}] {message}\n"
+    with OUTPUT_LOCK if OUTPUT_LOCK is not None else contextlib.nullcontext():
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+def get_key_boundaries(my_cursor, table_name, key_columns, total_rows, range_count):
+    """
+    Samples key quantiles splitting a table into range_count disjoint ranges.
+    Returns (lower, upper) pairs of key tuples where lower is exclusive, upper is
+    inclusive and None means the range is unbounded on that side.
+    """
+    key_sql = ", ".join(f"`{c}`" for c in key_columns)
+    quantiles = []
+    for k in range(1, range_count):
+        my_cursor.execute(
+            f"SELECT {key_sql} FROM `{table_name}` ORDER BY {key_sql} LIMIT 1 OFFSET %s",
+            (k * total_rows // range_count,)
+        )
+        rows = my_cursor.fetchall()
+        if rows and tuple(rows[0]) not in quantiles:
+            quantiles.append(tuple(rows[0]))
+    bounds = [None] + quantiles + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def build_key_condition(key_columns, values, operator):
+    """
+    Builds a keyset comparison such as (c1, c2) > (x, y) and its parameters.
+    Composite keys are expanded to c1 > x OR (c1 = x AND c2 > y), the form MySQL's
+    manual recommends over row constructors so that the key's index can be used.
+    operator is the comparison applied to the last key column, '>' or '<='.
+    """
+    strict_operator = operator[0]
+    disjuncts = []
+    params = []
+    for i, column in enumerate(key_columns):
+        terms = [f"`{c}` = %s" for c in key_columns[:i]]
+        terms.append(f"`{column}` {operator if i == len(key_columns) - 1 else strict_operator} %s")
+        disjuncts.append(" AND ".join(terms))
+        params.extend(values[:i + 1])
+    if len(disjuncts) == 1:
+        return disjuncts[0], params
+    return "(" + " OR ".join(f"({d})" for d in disjuncts) + ")", params
+
+def build_range_select(table_name, key_columns, lower, upper, order_by_key=False):
+    """Builds the SELECT statement and parameters streaming one key range."""
+    conditions = []
+    params = []
+    if lower is not None:
+        condition, condition_params = build_key_condition(key_columns, lower, '>')
+        conditions.append(condition)
+        params.extend(condition_params)
+    if upper is not None:
+        condition, condition_params = build_key_condition(key_columns, upper, '<=')
+        conditions.append(condition)
+        params.extend(condition_params)
+    query = f"SELECT * FROM `{table_name}`"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if order_by_key:
+        query += " ORDER BY " + ", ".join(f"`{c}`" for c in key_columns)
+    return query, tuple(params)
+
+def report_range_progress(table_name, progress_state, row_count):
+    """
+    Adds rows migrated by one range thread to the table's shared progress.
+    A terminal is redrawn at most every PROGRESS_INTERVAL seconds; other outputs
+    get a line at most every LOG_INTERVAL seconds.
+    """
+    with progress_state['lock']:
+        progress_state['migrated_rows'] += row_count
+        migrated_rows = progress_state['migrated_rows']
+        now = time.monotonic()
+        interactive = progress_state['interactive']
+        if now - progress_state['last_report_time'] < (PROGRESS_INTERVAL if interactive else LOG_INTERVAL):
+            return
+        progress_state['last_report_time'] = now
+        rows_per_second = migrated_rows / max(now - progress_state['start_time'], 1e-9)
+        time_remaining_str = format_time_remaining(progress_state['total_rows'], migrated_rows, rows_per_second)
+        write_progress(
+            table_name,
+            format_progress(migrated_rows, progress_state['total_rows'], progress_state['approximate'], time_remaining_str),
+            interactive
+        )
+
+def migrate_key_range(table_name, select_sql, params, mysql_config, pg_config, chunk_size,
+                      statements, writer, progress_state, errors):
+    """Thread body: migrates one key range over its own MySQL and PostgreSQL connections."""
+    my_conn = None
+    pg_conn = None
+    try:
+        my_conn = connect_mysql(mysql_config)
+        pg_conn = connect_postgres(pg_config)
+        with open_stream_cursor(my_conn) as data_cursor, pg_conn.cursor() as pg_cursor:
+            data_cursor.execute(select_sql, params)
+            fetchmany = data_cursor.fetchmany
+            _len = len
+            _write_rows = write_rows
+            _report_range_progress = report_range_progress
+            while True:
+                rows_chunk = fetchmany(chunk_size)
+                if not rows_chunk:
+                    break
+                writer = _write_rows(pg_cursor, table_name, statements, rows_chunk, writer)
+                _report_range_progress(table_name, progress_state, _len(rows_chunk))
+        pg_conn.commit()
+    except BaseException as err:
+        # Also catches the SystemExit raised by connect_* so a failed range is never silent.
+        errors.append(err)
+        if pg_conn:
+            pg_conn.rollback()
+    finally:
+        if my_conn:
+            my_conn.close()
+        if pg_conn:
+            pg_conn.close()
+
+def migrate_key_ranges(table_name, key_ranges, key_columns, mysql_config, pg_config, chunk_size,
+                       statements, writer, total_rows, approximate):
+    """Migrates the key ranges of a table concurrently, one thread per range."""
+    progress_state = {
+        'lock': threading.Lock(),
+        'migrated_rows': 0,
+        'total_rows': total_rows,
+        'approximate': approximate,
+        'interactive': sys.stdout.isatty(),
+        'start_time': time.monotonic(),
+        'last_report_time': time.monotonic()
+    }
+    errors = []
+    threads = []
+    for lower, upper in key_ranges:
+        select_sql, params = build_range_select(table_name, key_columns, lower, upper)
+        thread = threading.Thread(
+            target=migrate_key_range,
+            args=(table_name, select_sql, params, mysql_config, pg_config, chunk_size,
+                  statements, writer, progress_state, errors)
+        )
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    write_progress(
+        table_name,
+        format_progress(progress_state['migrated_rows'], total_rows, approximate, format_time(0)),
+        progress_state['interactive']
+    )
+    if errors:
+        print(f"\nWarning: {len(errors)} of {len(key_ranges)} key ranges of '{table_name}' failed.")
+        raise errors[0]
+
+
+def count_rows(my_cursor, table_name, exact):
+    """
+    Returns (row_count, is_approximate) for a MySQL table.
+    Unless exact is set, the count is the estimate cached in InnoDB's statistics,
+    which avoids the full index scan of COUNT(*) but may be off by a wide margin.
+    """
+    if exact:
+        my_cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
+        return my_cursor.fetchall()[0][0], False
+    my_cursor.execute(
+        "SELECT TABLE_ROWS FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        (table_name,)
+    )
+    rows = my_cursor.fetchall()
+    return (rows[0][0] or 0) if rows else 0, True
+
+def format_progress(migrated_rows, total_rows, approximate, time_remaining_str):
+    """Formats the progress line, flagging counts that are only estimates."""
+    total_str = f"approx. {total_rows}" if approximate else f"{total_rows}"
+    progress_str = f"{migrated_rows / total_rows * 100:.2f}%" if total_rows else "N/A"
+    return f"Progress: {migrated_rows}/{total_str} ({progress_str}) | ETR: {time_remaining_str}"
+
+def encode_key(values):
+    """Converts key values to JSON; bytes and decimals are tagged and other non-JSON types stringified."""
+    encoded = []
+    for value in values:
+        if isinstance(value, (bytes, bytearray)):
+            encoded.append({'hex': value.hex()})
+        elif isinstance(value, decimal.Decimal):
+            # Compared as a string, a DECIMAL key would be compared as DOUBLE by MySQL.
+            encoded.append({'decimal': str(value)})
+        elif isinstance(value, datetime.timedelta):
+            encoded.append(format_mysql_time(value))
+        elif value is None or isinstance(value, (int, float, str)):
+            encoded.append(value)
+        else:
+            # MySQL converts strings back when comparing them with DATE/DATETIME keys.
+            encoded.append(str(value))
+    return encoded
+
+def decode_key(values):
+    """Restores key values encoded by encode_key."""
+    decoded = []
+    for value in values:
+        if isinstance(value, dict) and 'hex' in value:
+            decoded.append(bytes.fromhex(value['hex']))
+        elif isinstance(value, dict):
+            decoded.append(decimal.Decimal(value['decimal']))
+        else:
+            decoded.append(value)
+    return tuple(decoded)
+
+def load_state(state_file):
+    """Loads the checkpoint state file, a JSON object keyed by table name."""
+    try:
+        with open(state_file, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_checkpoint(state_file, table_name, checkpoint):
+    """Records a table's checkpoint in the state file, or clears it when checkpoint is None."""
+    with STATE_LOCK if STATE_LOCK is not None else contextlib.nullcontext():
+        state = load_state(state_file)
+        if checkpoint is None:
+            if table_name not in state:
+                return
+            del state[table_name]
+        else:
+            state[table_name] = checkpoint
+        if not state:
+            os.remove(state_file)
+            return
+        # Write to a temporary file first so a crash never leaves a truncated state file.
+        tmp_file = f"{state_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, state_file)
+
+def resolve_checkpoint(pg_cursor, table_name, checkpoint):
+    """
+    Settles the batch a checkpoint recorded as pending just before committing it.
+    A batch is committed as a whole, so it made it if PostgreSQL holds the row
+    with its last key. Returns the checkpoint to resume from.
+    """
+    pending = checkpoint.pop('pending', None)
+    if pending is None:
+        return checkpoint
+    if pending['last_key'] is not None and pending['last_key'] != checkpoint['last_key']:
+        key_columns = checkpoint['key_columns']
+        pg_cursor.execute(
+            sql.SQL("SELECT 1 FROM {} WHERE ({}) = ({}) LIMIT 1").format(
+                sql.Identifier(table_name),
+                sql.SQL(", ").join(map(sql.Identifier, key_columns)),
+                sql.SQL(", ").join(sql.Placeholder() * len(key_columns))
+            ),
+            decode_key(pending['last_key'])
+        )
+        if pg_cursor.fetchone() is None:
+            return checkpoint
+    checkpoint.update(pending)
+    return checkpoint
+
+def format_time_remaining(total_rows, migrated_rows, rows_per_second):
+    """Formats the estimated time remaining at the given migration rate."""
+    if rows_per_second <= 0:
+        return "Infinite"
+    return format_time((total_rows - migrated_rows) / rows_per_second)
 
 def format_time(seconds):
     """Formats seconds into a human-readable string (MM:SS)."""
@@ -106,34 +679,57 @@ def format_time(seconds):
     seconds = int(seconds % 60)
     return f"{minutes:02d}m {seconds:02d}s"
 
-def migrate_table(table_name, my_conn, pg_conn, chunk_size, recreate, truncate, current_index, total_tables):
-    """Migrates a single table from MySQL to PostgreSQL, including indexes."""
+def build_deferred_ddl(pg_conn, deferred_ddl):
+    """
+    Builds the primary key, indexes and triggers of a table after its data is loaded.
+    The statements run in the current transaction, which the caller commits.
+    """
+    if not deferred_ddl:
+        return
+    print("Building primary key, indexes and triggers...")
+    with pg_conn.cursor() as pg_cursor:
+        for description, ddl_sql in deferred_ddl:
+            print(description)
+            pg_cursor.execute(ddl_sql)
+
+def migrate_table(table_name, my_conn, pg_conn, chunk_size, recreate, truncate, current_index, total_tables,
+                  schema=None, writer='copy', unlogged_fast_load=False, commit_every=10, state_file=None,
+                  exact_count=False, range_threads=1, range_threshold=1000000, mysql_config=None, pg_config=None):
+    """
+    Migrates a single table from MySQL to PostgreSQL, including indexes.
+    The table's columns and indexes are taken from schema (see get_mysql_schemas)
+    when given, and queried with DESCRIBE and SHOW INDEX otherwise.
+    """
     print(f"\n----- Processing table: {table_name} ({current_index}/{total_tables}) -----")
     with my_conn.cursor() as my_cursor, pg_conn.cursor() as pg_cursor:
         # 1. Get MySQL table schema and identify primary key columns
-        my_cursor.execute(f"DESCRIBE `{table_name}`")
-        columns_schema = my_cursor.fetchall()
+        if schema is not None:
+            columns_schema = schema['columns']
+        else:
+            my_cursor.execute(f"DESCRIBE `{table_name}`")
+            columns_schema = my_cursor.fetchall()
         
         pk_columns = [col[0] for col in columns_schema if col[3] in (b'PRI', 'PRI')]
 
         column_defs = []
-        for col in columns_schema:
+        # Only columns loaded as CHAR/VARCHAR/TEXT can hold NUL characters that need
+        # stripping. This includes the TEXT fallback for ENUM, SET, JSON, TIME, etc.
+        text_columns = []
+        for i, col in enumerate(columns_schema):
             col_name = col[0]
             col_type = col[1].decode('utf-8') if isinstance(col[1], bytearray) else col[1]
             pg_type = map_mysql_to_postgres_type(col_type)
+            if pg_type.upper().startswith(POSTGRES_TEXT_TYPES):
+                text_columns.append(i)
             nullable = "NULL" if col[2] == 'YES' else "NOT NULL"
-            column_defs.append(f'"{col_name}" {pg_type} {nullable}')
-
-        if pk_columns:
-            pk_cols_sql = '", "'.join(pk_columns)
-            column_defs.append(f'PRIMARY KEY ("{pk_cols_sql}")')
-
-        # Determine the primary key column for pagination (if single)
-        primary_key_column = pk_columns[0] if len(pk_columns) == 1 else None
+            column_defs.append(sql.SQL("{} {} {}").format(sql.Identifier(col_name), sql.SQL(pg_type), sql.SQL(nullable)))
 
         # --- Get All Index Info ---
-        my_cursor.execute(f"SHOW INDEX FROM `{table_name}`")
-        mysql_indexes = my_cursor.fetchall()
+        if schema is not None:
+            mysql_indexes = schema['indexes']
+        else:
+            my_cursor.execute(f"SHOW INDEX FROM `{table_name}`")
+            mysql_indexes = my_cursor.fetchall()
         indexes_to_create = {}
         fulltext_indexes = {}
         for index_row in mysql_indexes:
@@ -157,189 +753,384 @@ def migrate_table(table_name, my_conn, pg_conn, chunk_size, recreate, truncate,
             seq_in_index = index_row[3]
             indexes_to_create[key_name]['columns'].append((seq_in_index, col_name))
 
+        # Collect all unique columns from all fulltext indexes
+        fulltext_columns = sorted({col_name for index_data in fulltext_indexes.values() for _, col_name in index_data})
+
+        # Determine the key used to split the table into ranges: the primary key
+        # (single or composite), otherwise a unique index over NOT NULL columns.
+        key_columns = pk_columns
+        if not key_columns:
+            not_null_columns = {col[0] for col in columns_schema if col[2] != 'YES'}
+            for index_data in indexes_to_create.values():
+                index_columns = [col[1] for col in sorted(index_data['columns'])]
+                if not index_data['non_unique'] and set(index_columns) <= not_null_columns:
+                    key_columns = index_columns
+                    break
+
         # 2. Handle table existence in PostgreSQL
-        pg_cursor.execute("SELECT to_regclass(%s)", (f"public.{table_name}",))
+        table_sql = sql.Identifier(table_name)
+        pg_cursor.execute("SELECT to_regclass(%s)", (sql.Identifier('public', table_name).as_string(pg_conn),))
         table_exists = pg_cursor.fetchone()[0] is not None
 
+        # A checkpoint left by an interrupted run is resumed as long as the table
+        # still exists and matches it. Once a batch is known to be committed, the
+        # interrupted run's drop or truncate is too, so --recreate and --truncate
+        # are not applied again. Until then the table is set up again from scratch.
+        checkpoint = load_state(state_file).get(table_name) if state_file else None
+        if checkpoint is not None:
+            if not table_exists or checkpoint['key_columns'] != pk_columns:
+                print(f"Discarding the stale checkpoint for table '{table_name}'.")
+                save_checkpoint(state_file, table_name, None)
+                checkpoint = None
+            elif checkpoint['last_key'] is None and checkpoint['setup'] is not None:
+                print(f"Restarting table '{table_name}', whose first batch may not have been committed.")
+                save_checkpoint(state_file, table_name, None)
+                recreate = recreate or checkpoint['setup'] in ('create', 'recreate')
+                truncate = truncate or checkpoint['setup'] == 'truncate'
+                checkpoint = None
+            else:
+                checkpoint = resolve_checkpoint(pg_cursor, table_name, checkpoint)
+                print(f"Resuming table '{table_name}' from checkpoint after {checkpoint['migrated_rows']} records.")
+                recreate = truncate = False
+
+        # How this run prepared the table, recorded until its first batch is committed.
+        setup = None
         if recreate and table_exists:
             print(f"Dropping table '{table_name}' in PostgreSQL as per --recreate flag.")
-            pg_cursor.execute(f'DROP TABLE "{table_name}" CASCADE')
+            pg_cursor.execute(sql.SQL("DROP TABLE {} CASCADE").format(table_sql))
             table_exists = False
+            setup = 'recreate'
         
+        deferred_ddl = [tuple(ddl) for ddl in checkpoint['deferred_ddl']] if checkpoint else []
+        created_table = not table_exists
         if not table_exists:
             print(f"Creating table '{table_name}' in PostgreSQL.")
+            setup = setup or 'create'
             
             if fulltext_indexes:
                 # Check if fts_vector column already exists to avoid duplication
-                if not any('"fts_vector"' in s for s in column_defs):
-                    column_defs.append('"fts_vector" tsvector')
+                if not any(col[0] == 'fts_vector' for col in columns_schema):
+                    column_defs.append(sql.SQL("{} tsvector").format(sql.Identifier('fts_vector')))
 
-            create_sql = f'CREATE TABLE "{table_name}" ({", ".join(column_defs)})'
+            # The primary key and indexes are only built once the data is loaded:
+            # one sort per index is much cheaper than maintaining them row by row.
+            # An UNLOGGED table skips WAL writes while loading; it is switched to
+            # LOGGED below, but a crash before that loses the table's contents.
+            unlogged_str = "UNLOGGED " if unlogged_fast_load else ""
+            create_sql = sql.SQL("CREATE {}TABLE {} ({})").format(
+                sql.SQL(unlogged_str), table_sql, sql.SQL(", ").join(column_defs)
+            )
             pg_cursor.execute(create_sql)
             print("Table created successfully.")
 
-            # --- Create Standard Indexes ---
-            print("Migrating standard indexes...")
+            # Deferred statements are rendered to strings so they can be checkpointed.
+            # SET LOGGED rewrites the table along with its indexes, so it comes first
+            # and each index is then built only once, on the logged table.
+            if unlogged_fast_load:
+                deferred_ddl.append((
+                    f"  - Switching table '{table_name}' to LOGGED",
+                    sql.SQL("ALTER TABLE {} SET LOGGED").format(table_sql).as_string(pg_conn)
+                ))
+
+            # --- Plan Primary Key and Standard Indexes ---
+            if pk_columns:
+                pk_sql = sql.SQL("ALTER TABLE {} ADD PRIMARY KEY ({})").format(
+                    table_sql, sql.SQL(", ").join(map(sql.Identifier, pk_columns))
+                )
+                deferred_ddl.append((
+                    f"  - Adding primary key on column(s): {', '.join(pk_columns)}",
+                    pk_sql.as_string(pg_conn)
+                ))
             for index_name, index_data in indexes_to_create.items():
                 sorted_columns = [col[1] for col in sorted(index_data['columns'])]
-                columns_sql = '", "'.join(sorted_columns)
                 unique_str = "" if index_data['non_unique'] else "UNIQUE "
-                index_sql = f'CREATE {unique_str}INDEX IF NOT EXISTS "{index_name}" ON "{table_name}" ("{columns_sql}")'
-                print(f"  - Creating index '{index_name}' on column(s): {', '.join(sorted_columns)}")
-                pg_cursor.execute(index_sql)
+                index_sql = sql.SQL("CREATE {}INDEX IF NOT EXISTS {} ON {} ({})").format(
+                    sql.SQL(unique_str),
+                    sql.Identifier(index_name),
+                    table_sql,
+                    sql.SQL(", ").join(map(sql.Identifier, sorted_columns))
+                )
+                deferred_ddl.append((
+                    f"  - Creating index '{index_name}' on column(s): {', '.join(sorted_columns)}",
+                    index_sql.as_string(pg_conn)
+                ))
 
-            # --- Handle ALL FULLTEXT indexes for the table at once ---
+            # --- Plan ALL FULLTEXT indexes for the table at once ---
             if fulltext_indexes:
-                print("Migrating FULLTEXT indexes to PostgreSQL FTS...")
-
-                # 1. Collect all unique columns from all fulltext indexes
-                all_fulltext_columns = set()
-                for index_name, index_data in fulltext_indexes.items():
-                    for _, col_name in index_data:
-                        all_fulltext_columns.add(col_name)
-                
-                sorted_columns = sorted(list(all_fulltext_columns))
-                
-                print(f"  - Creating FTS infrastructure for column(s): {', '.join(sorted_columns)}")
-
-                # 2. Create a single GIN index
+                # 1. Create a single GIN index
                 gin_index_name = f"{table_name}_fts_gin"
-                gin_sql = f'CREATE INDEX "{gin_index_name}" ON "{table_name}" USING GIN ("fts_vector")'
-                print(f"    - Creating GIN index '{gin_index_name}'")
-                pg_cursor.execute(gin_sql)
+                gin_sql = sql.SQL("CREATE INDEX {} ON {} USING GIN ({})").format(
+                    sql.Identifier(gin_index_name), table_sql, sql.Identifier('fts_vector')
+                )
+                deferred_ddl.append((f"  - Creating FTS GIN index '{gin_index_name}'", gin_sql.as_string(pg_conn)))
 
-                # 3. Create a single trigger function
+                # 2. Create a single trigger function
                 trigger_func_name = f"update_{table_name}_fts_vector"
-                coalesce_cols = " || ' ' || ".join([f"coalesce(NEW.\"{col}\", '')" for col in sorted_columns])
-                trigger_func_sql = f"""
-                CREATE OR REPLACE FUNCTION {trigger_func_name}() RETURNS TRIGGER AS $$
+                coalesce_cols = sql.SQL(" || ' ' || ").join(
+                    [sql.SQL("coalesce(NEW.{}, '')").format(sql.Identifier(col)) for col in fulltext_columns]
+                )
+                trigger_func_sql = sql.SQL("""
+                CREATE OR REPLACE FUNCTION {}() RETURNS TRIGGER AS $$
                 BEGIN
-                    NEW.fts_vector := to_tsvector('english', {coalesce_cols});
+                    NEW.fts_vector := to_tsvector('english', {});
                     RETURN NEW;
                 END
                 $$ LANGUAGE plpgsql;
-                """
-                print(f"    - Creating trigger function '{trigger_func_name}'")
-                pg_cursor.execute(trigger_func_sql)
+                """).format(sql.Identifier(trigger_func_name), coalesce_cols)
+                deferred_ddl.append((
+                    f"  - Creating FTS trigger function '{trigger_func_name}'",
+                    trigger_func_sql.as_string(pg_conn)
+                ))
 
-                # 4. Create a single trigger
+                # 3. Create a single trigger
                 trigger_name = f"{table_name}_fts_trigger"
-                trigger_sql = f"""
-                CREATE TRIGGER {trigger_name}
-                BEFORE INSERT OR UPDATE ON "{table_name}"
-                FOR EACH ROW EXECUTE PROCEDURE {trigger_func_name}();
-                """
-                print(f"    - Creating trigger '{trigger_name}'")
-                pg_cursor.execute(trigger_sql)
-            # --- End Index Migration ---
+                trigger_sql = sql.SQL("""
+                CREATE TRIGGER {}
+                BEFORE INSERT OR UPDATE ON {}
+                FOR EACH ROW EXECUTE PROCEDURE {}();
+                """).format(sql.Identifier(trigger_name), table_sql, sql.Identifier(trigger_func_name))
+                deferred_ddl.append((f"  - Creating FTS trigger '{trigger_name}'", trigger_sql.as_string(pg_conn)))
 
         elif truncate:
             print(f"Truncating table '{table_name}' in PostgreSQL as per --truncate flag.")
-            pg_cursor.execute(f'TRUNCATE TABLE "{table_name}" RESTART IDENTITY CASCADE')
+            pg_cursor.execute(sql.SQL("TRUNCATE TABLE {} RESTART IDENTITY CASCADE").format(table_sql))
+            setup = 'truncate'
 
         # 4. Migrate data in chunks
-        my_cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
-        total_rows = my_cursor.fetchone()[0]
-        
-        if total_rows == 0:
+        total_rows, approximate = count_rows(my_cursor, table_name, exact_count)
+
+        # An estimate of zero can be stale, so only an exact count skips the table.
+        if total_rows == 0 and not approximate:
             print("Table is empty. No data to migrate.")
-            if fulltext_indexes:
-                pg_conn.commit()
+            build_deferred_ddl(pg_conn, deferred_ddl)
+            pg_conn.commit()
+            if checkpoint is not None:
+                save_checkpoint(state_file, table_name, None)
             return
 
-        print(f"Starting data migration for {total_rows} records...")
-        migrated_rows = 0
-        time_remaining_str = "Calculating..."
+        if approximate:
+            print(f"Starting data migration for approx. {total_rows} records...")
+        else:
+            print(f"Starting data migration for {total_rows} records...")
+        migrated_rows = checkpoint['migrated_rows'] if checkpoint else 0
 
         column_names = [col[0] for col in columns_schema]
-        insert_sql = f'INSERT INTO "{table_name}" ({", ".join([f'"{c}"' for c in column_names])}) VALUES %s'
+        statements = build_load_statements(pg_conn, table_name, column_names, text_columns)
         
-        # --- Choose Pagination Strategy ---
-        if primary_key_column:
-            print(f"Using efficient keyset pagination on primary key: '{primary_key_column}'")
-            last_id = 0
-            while True:
-                start_time = time.time()
-                query = f"SELECT * FROM `{table_name}` WHERE `{primary_key_column}` > %s ORDER BY `{primary_key_column}` ASC LIMIT %s"
-                my_cursor.execute(query, (last_id, chunk_size))
-                rows_chunk = my_cursor.fetchall()
-
-                if not rows_chunk:
-                    break
-                
-                sanitized_rows = [tuple(c.replace('\x00', '') if isinstance(c, str) else c for c in row) for row in rows_chunk]
-                extras.execute_values(pg_cursor, insert_sql, sanitized_rows)
-                
-                chunk_time = time.time() - start_time
-                migrated_rows += len(rows_chunk)
-                last_id = rows_chunk[-1][column_names.index(primary_key_column)]
-
-                if chunk_time > 0:
-                    rows_per_second = len(rows_chunk) / chunk_time
-                    rows_remaining = total_rows - migrated_rows
-                    if rows_per_second > 0:
-                        time_remaining_seconds = rows_remaining / rows_per_second
-                        time_remaining_str = format_time(time_remaining_seconds)
-                    else:
-                        time_remaining_str = "Infinite"
-                
-                progress = (migrated_rows / total_rows) * 100
-                sys.stdout.write(f"\rProgress: {migrated_rows}/{total_rows} ({progress:.2f}%) | ETR: {time_remaining_str}   ")
-                sys.stdout.flush()
-
+        # Ranges are not checkpointed, so a resumed table is always streamed.
+        use_checkpoints = False
+        use_ranges = (range_threads > 1 and key_columns and checkpoint is None
+                      and total_rows >= range_threshold and mysql_config is not None)
+        if use_ranges:
+            key_ranges = get_key_boundaries(my_cursor, table_name, key_columns, total_rows, range_threads)
+            print(f"Migrating {len(key_ranges)} ranges of key ({', '.join(key_columns)}) in parallel.")
+            # The range threads use their own connections, so the created or
+            # truncated table has to be committed before they can load into it.
+            # Ranges are not checkpointed, but recording how the table was set up
+            # lets a run interrupted mid-load, even by a crash, set it up again
+            # from scratch instead of appending to a partial table.
+            if state_file is not None and setup is not None:
+                save_checkpoint(state_file, table_name, {
+                    'key_columns': pk_columns,
+                    'setup': setup,
+                    'deferred_ddl': deferred_ddl,
+                    'last_key': None,
+                    'migrated_rows': 0
+                })
+            pg_conn.commit()
+            try:
+                migrate_key_ranges(
+                    table_name,
+                    key_ranges,
+                    key_columns,
+                    mysql_config,
+                    pg_config,
+                    chunk_size,
+                    statements,
+                    writer,
+                    total_rows,
+                    approximate
+                )
+            except BaseException:
+                # A partially loaded new table has none of its keys and indexes yet:
+                # drop it so a rerun starts over.
+                if created_table:
+                    print(f"Dropping the partially loaded table '{table_name}'.")
+                    pg_cursor.execute(sql.SQL("DROP TABLE IF EXISTS {} CASCADE").format(table_sql))
+                    pg_conn.commit()
+                    if state_file is not None:
+                        save_checkpoint(state_file, table_name, None)
+                elif state_file is not None and setup is not None:
+                    print(f"Completed ranges of '{table_name}' remain committed until the next run truncates the table again.")
+                else:
+                    print(f"Completed ranges of '{table_name}' remain committed.")
+                raise
+        elif checkpoint is not None and checkpoint.get('loaded'):
+            print("All rows were loaded before the interruption.")
         else:
-            if len(pk_columns) > 1:
-                print("Warning: Composite primary key detected. Falling back to less efficient OFFSET pagination.")
+            # --- Stream rows with an unbuffered cursor ---
+            # A single SELECT is streamed from the server and consumed chunk by chunk
+            # on a reader thread, so no LIMIT/OFFSET round-trips are needed and only a
+            # few chunks are held in memory while PostgreSQL writes the current one.
+            print("Streaming rows from MySQL with an unbuffered cursor.")
+            # Checkpoints need rows in key order to know where to resume. Only the
+            # primary key is used: InnoDB reads rows in its order for free, whereas
+            # ordering by a unique secondary index typically filesorts the whole
+            # table first. A table created UNLOGGED is emptied by a crash, so it is
+            # never checkpointed. A resumed table is streamed in key order regardless.
+            use_checkpoints = checkpoint is not None or (
+                state_file is not None and commit_every > 0 and bool(pk_columns)
+                and not (unlogged_fast_load and created_table)
+            )
+            if use_checkpoints:
+                key_indices = [column_names.index(c) for c in pk_columns]
+                committed_state = {
+                    'key_columns': pk_columns,
+                    'setup': setup,
+                    'deferred_ddl': deferred_ddl,
+                    'last_key': checkpoint['last_key'] if checkpoint else None,
+                    'migrated_rows': migrated_rows
+                }
+                resume_key = decode_key(committed_state['last_key']) if committed_state['last_key'] is not None else None
+                select_sql, params = build_range_select(table_name, pk_columns, resume_key, None, order_by_key=True)
             else:
-                print("Warning: No single primary key found. Falling back to less efficient OFFSET pagination.")
-            
-            offset = 0
-            while offset < total_rows:
-                start_time = time.time()
-                my_cursor.execute(f"SELECT * FROM `{table_name}` LIMIT %s OFFSET %s", (chunk_size, offset))
-                rows_chunk = my_cursor.fetchall()
-                if not rows_chunk:
-                    break
-                
-                sanitized_rows = [tuple(c.replace('\x00', '') if isinstance(c, str) else c for c in row) for row in rows_chunk]
-                extras.execute_values(pg_cursor, insert_sql, sanitized_rows)
-                
-                chunk_time = time.time() - start_time
-                migrated_rows += len(rows_chunk)
-                offset += chunk_size
-                
-                if chunk_time > 0:
-                    rows_per_second = len(rows_chunk) / chunk_time
-                    rows_remaining = total_rows - migrated_rows
-                    if rows_per_second > 0:
-                        time_remaining_seconds = rows_remaining / rows_per_second
-                        time_remaining_str = format_time(time_remaining_seconds)
-                    else:
-                        time_remaining_str = "Infinite"
-
-                progress = (migrated_rows / total_rows) * 100
-                sys.stdout.write(f"\rProgress: {migrated_rows}/{total_rows} ({progress:.2f}%) | ETR: {time_remaining_str}   ")
-                sys.stdout.flush()
+                select_sql, params = f"SELECT * FROM `{table_name}`", ()
+            # Terminals get a progress line redrawn at most every PROGRESS_INTERVAL
+            # seconds; logs and pipes get a line at most every LOG_INTERVAL seconds.
+            interactive = sys.stdout.isatty()
+            chunk_count = 0
+            rows_chunk = None
+            last_report_time = time.monotonic()
+            last_report_rows = migrated_rows
+            # Local names skip the global and attribute lookups on every chunk.
+            _len = len
+            _monotonic = time.monotonic
+            _write_rows = write_rows
+            progress_interval = PROGRESS_INTERVAL if interactive else LOG_INTERVAL
+            with open_stream_cursor(my_conn) as data_cursor:
+                data_cursor.execute(select_sql, params)
+                with contextlib.closing(stream_chunks(data_cursor, chunk_size)) as chunks:
+                    for rows_chunk in chunks:
+                        writer = _write_rows(pg_cursor, table_name, statements, rows_chunk, writer)
+                        migrated_rows += _len(rows_chunk)
+
+                        chunk_count += 1
+                        end_of_batch = commit_every > 0 and chunk_count % commit_every == 0
+                        if use_checkpoints and end_of_batch:
+                            # The batch is recorded as pending before it is committed, so
+                            # a crash on either side of the commit is settled on resume
+                            # by looking up its last key (see resolve_checkpoint) instead
+                            # of re-sending or skipping the batch.
+                            last_key = encode_key([rows_chunk[-1][i] for i in key_indices])
+                            save_checkpoint(state_file, table_name, dict(committed_state, pending={
+                                'last_key': last_key,
+                                'migrated_rows': migrated_rows
+                            }))
+                            pg_conn.commit()
+                            committed_state.update(last_key=last_key, migrated_rows=migrated_rows)
+
+                        now = _monotonic()
+                        if now - last_report_time < progress_interval:
+                            continue
+                        rows_per_second = (migrated_rows - last_report_rows) / max(now - last_report_time, 1e-9)
+                        time_remaining_str = format_time_remaining(total_rows, migrated_rows, rows_per_second)
+                        write_progress(table_name, format_progress(migrated_rows, total_rows, approximate, time_remaining_str), interactive)
+                        last_report_time = now
+                        last_report_rows = migrated_rows
+
+            write_progress(table_name, format_progress(migrated_rows, total_rows, approximate, format_time(0)), interactive)
+
+            if use_checkpoints:
+                # The remaining rows are committed along with the FTS update below. Once
+                # they are, a resumed run skips streaming and only builds the deferred DDL.
+                last_key = (encode_key([rows_chunk[-1][i] for i in key_indices])
+                            if rows_chunk else committed_state['last_key'])
+                save_checkpoint(state_file, table_name, dict(committed_state, pending={
+                    'last_key': last_key,
+                    'migrated_rows': migrated_rows,
+                    'loaded': True
+                }))
 
         print("\nData migration completed for this table.")
 
         # --- Populate fts_vector for existing data ---
+        # Done before the indexes are built so the UPDATE doesn't have to maintain them.
         if fulltext_indexes:
             print("Populating 'fts_vector' for migrated data...")
-            all_fulltext_columns = set()
-            for index_name, index_data in fulltext_indexes.items():
-                for _, col_name in index_data:
-                    all_fulltext_columns.add(col_name)
-            
-            sorted_columns = sorted(list(all_fulltext_columns))
-
-            coalesce_cols = " || ' ' || ".join([f"coalesce(\"{col}\", '')" for col in sorted_columns])
-            update_sql = f"UPDATE \"{table_name}\" SET fts_vector = to_tsvector('english', {coalesce_cols});"
-            print(f"  - Populating FTS data for columns: {', '.join(sorted_columns)}...")
+            coalesce_cols = sql.SQL(" || ' ' || ").join(
+                [sql.SQL("coalesce({}, '')").format(sql.Identifier(col)) for col in fulltext_columns]
+            )
+            update_sql = sql.SQL("UPDATE {} SET fts_vector = to_tsvector('english', {})").format(table_sql, coalesce_cols)
+            print(f"  - Populating FTS data for columns: {', '.join(fulltext_columns)}...")
             pg_cursor.execute(update_sql)
             print("  - FTS data populated.")
 
+        # A load committed along the way (by checkpoints or for the range threads) is
+        # committed before the deferred DDL, so a resumed run only has to rebuild the
+        # latter. Otherwise the DDL joins the load's single transaction, and a failing
+        # statement rolls the whole table back instead of leaving it committed
+        # without its keys and indexes.
+        if use_ranges or use_checkpoints:
+            pg_conn.commit()
+        build_deferred_ddl(pg_conn, deferred_ddl)
         pg_conn.commit()
+        if state_file is not None:
+            save_checkpoint(state_file, table_name, None)
+
+
+def init_worker(output_lock, state_lock):
+    """Initializes a worker process with the locks guarding the progress line and the state file."""
+    global OUTPUT_LOCK, STATE_LOCK
+    OUTPUT_LOCK = output_lock
+    STATE_LOCK = state_lock
+
+def migrate_table_worker(table_name, mysql_config, pg_config, *args, **kwargs):
+    """Migrates a single table in a worker process using its own database connections."""
+    # Connections can't be shared across processes, so each worker opens its own.
+    my_conn = connect_mysql(mysql_config)
+    pg_conn = connect_postgres(pg_config)
+    try:
+        migrate_table(table_name, my_conn, pg_conn, *args,
+                      mysql_config=mysql_config, pg_config=pg_config, **kwargs)
+    except (mysql.connector.Error, psycopg2.Error):
+        pg_conn.rollback()
+        raise
+    finally:
+        my_conn.close()
+        pg_conn.close()
+
+def migrate_tables_in_parallel(source_tables, schemas, config, workers, *args, **kwargs):
+    """Migrates tables concurrently using a pool of worker processes."""
+    print(f"Migrating tables with {workers} worker processes.")
+    mysql_config = dict(config['mysql'])
+    pg_config = dict(config['postgresql'])
+    total_tables = len(source_tables)
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(multiprocessing.Lock(), multiprocessing.Lock())
+    ) as executor:
+        futures = [
+            executor.submit(
+                migrate_table_worker,
+                table_name,
+                mysql_config,
+                pg_config,
+                *args,
+                current_index=i,
+                total_tables=total_tables,
+                schema=schemas.get(table_name),
+                **kwargs
+            )
+            for i, table_name in enumerate(source_tables, 1)
+        ]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
 
 
 def main():
@@ -422,18 +1213,49 @@ def main():
         print("----------------------------------")
         # --- End Confirmation Step ---
 
-        total_tables = len(source_tables)
-        for i, table_name in enumerate(source_tables, 1):
-            migrate_table(
-                table_name, 
-                my_conn, 
-                pg_conn, 
+        # Fetch all table schemas in two queries instead of two per table.
+        schemas = get_mysql_schemas(my_conn)
+
+        if args.workers > 1:
+            migrate_tables_in_parallel(
+                source_tables,
+                schemas,
+                config,
+                args.workers,
                 args.chunk_size,
                 args.recreate,
                 args.truncate,
-                current_index=i,
-                total_tables=total_tables
+                writer=args.writer,
+                unlogged_fast_load=args.unlogged_fast_load,
+                commit_every=args.commit_every,
+                state_file=args.state_file,
+                exact_count=args.exact_count,
+                range_threads=args.range_threads,
+                range_threshold=args.range_threshold
             )
+        else:
+            total_tables = len(source_tables)
+            for i, table_name in enumerate(source_tables, 1):
+                migrate_table(
+                    table_name, 
+                    my_conn, 
+                    pg_conn, 
+                    args.chunk_size,
+                    args.recreate,
+                    args.truncate,
+                    current_index=i,
+                    total_tables=total_tables,
+                    schema=schemas.get(table_name),
+                    writer=args.writer,
+                    unlogged_fast_load=args.unlogged_fast_load,
+                    commit_every=args.commit_every,
+                    state_file=args.state_file,
+                    exact_count=args.exact_count,
+                    range_threads=args.range_threads,
+                    range_threshold=args.range_threshold,
+                    mysql_config=config['mysql'],
+                    pg_config=config['postgresql']
+                )
         print("\nMigration finished for all tables.")
     except (mysql.connector.Error, psycopg2.Error) as err:
         print(f"\nAn error occurred during migration: {err}")